@@ -10,7 +10,7 @@ import logging
 import os
 import threading
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from queue import Empty, Queue
 from typing import Dict, List, Optional, Set, Union, cast, Any
 
@@ -30,6 +30,7 @@ PING_TIMEOUT: int = 5
 MAX_PING_RETRIES: int = 3
 BUFFER_SIZE: int = 100
 BUFFER_TIMEOUT: int = 5
+AGGREGATE_REFRESH_INTERVAL: int = 60
 RATE_LIMIT_WAIT: int = 60  # 60 saniye bekle
 
 StockData = Dict[str, Any]  # Holds any stock related data
@@ -89,7 +90,7 @@ class FinnhubWebSocket:
         )
         # Buffer for storing trade data
         self.buffer: Queue = Queue(maxsize=BUFFER_SIZE)
-        self.last_buffer_process_time: float = time.time()
+        self.last_buffer_process_time: float = time.monotonic()
         self.connect()
 
     def should_reconnect(self) -> bool:
@@ -101,7 +102,7 @@ class FinnhubWebSocket:
         Returns:
             bool: Whether to attempt reconnection
         """
-        now: float = time.time()
+        now: float = time.monotonic()
         if self.retry_count >= MAX_RETRIES:
             if now - self.last_connection_time < RECONNECT_DELAY:
                 return False
@@ -121,7 +122,7 @@ class FinnhubWebSocket:
             time.sleep(RECONNECT_DELAY)
             return
 
-        self.last_connection_time = time.time()
+        self.last_connection_time = time.monotonic()
         self.retry_count += 1
 
         try:
@@ -160,7 +161,7 @@ class FinnhubWebSocket:
         Returns:
             bool: Whether to process the message
         """
-        now = time.time()
+        now = time.monotonic()
         time_since_last_sync = now - self.last_sync_time
 
         if time_since_last_sync >= (SYNC_INTERVAL - SYNC_TOLERANCE):
@@ -192,23 +193,16 @@ class FinnhubWebSocket:
 
             if trades_to_process:
                 logger.info(f"Attempting to process {len(trades_to_process)} trades from buffer")
-                success_count = 0
-                for trade in trades_to_process:
-                    self.rate_limiter.wait_if_needed()
-                    result = self.db_manager.insert_stock_data(trade)
-                    if result:
-                        success_count += 1
-                        logger.info(
-                            f"✓ Saved to DB: {trade['symbol']} - ${float(trade['price']):.2f} "
-                            f"(Volume: {trade['volume']}, Time: {trade['timestamp']})"
-                        )
-                    else:
-                        logger.error(
-                            f"✗ Failed to save: {trade['symbol']} - ${float(trade['price']):.2f}"
-                        )
+                # One rate limiter slot and one INSERT for the whole batch
+                self.rate_limiter.wait_if_needed()
+                inserted_ids = self.db_manager.bulk_insert_stock_data(trades_to_process)
+                success_count = len(inserted_ids)
+                failed_count = len(trades_to_process) - success_count
+                if failed_count:
+                    logger.error(f"✗ Failed to save {failed_count} trades")
 
                 logger.info(f"Successfully processed {success_count}/{len(trades_to_process)} trades")
-                self.last_buffer_process_time = time.time()
+                self.last_buffer_process_time = time.monotonic()
 
         except Exception as e:
             logger.error(f"Buffer processing error: {str(e)}")
@@ -222,7 +216,7 @@ class FinnhubWebSocket:
         logger.info("Buffer monitor started")
         while True:
             try:
-                now = time.time()
+                now = time.monotonic()
                 if (
                     now - self.last_buffer_process_time >= BUFFER_TIMEOUT
                     or self.buffer.qsize() >= BUFFER_SIZE
@@ -234,6 +228,20 @@ class FinnhubWebSocket:
                 logger.error(f"Buffer monitor error: {str(e)}")
                 time.sleep(1)
 
+    def aggregate_refresher(self) -> None:
+        """Refresh the 1 minute aggregate view periodically.
+
+        Runs on a thread of its own, so a long refresh never holds up
+        the buffer flushes of buffer_monitor.
+        """
+        logger.info("Aggregate refresher started")
+        while True:
+            time.sleep(AGGREGATE_REFRESH_INTERVAL)
+            try:
+                self.db_manager.refresh_aggregates()
+            except Exception as e:
+                logger.error(f"Aggregate refresher error: {str(e)}")
+
     def on_message(self, ws: websocket.WebSocketApp, message: str) -> None:
         """Process incoming WebSocket messages.
 
@@ -254,8 +262,8 @@ class FinnhubWebSocket:
 
                     price = float(trade["p"])
                     volume = float(trade["v"])
-                    timestamp = datetime.fromtimestamp(int(trade["t"]) / 1000).strftime(
-                        "%Y-%m-%d %H:%M:%S"
+                    timestamp = datetime.fromtimestamp(
+                        int(trade["t"]) / 1000, tz=timezone.utc
                     )
 
                     stock_data: StockData = {
@@ -263,14 +271,16 @@ class FinnhubWebSocket:
                         "price": price,
                         "volume": volume,
                         "timestamp": timestamp,
-                        "collected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "collected_at": datetime.now(timezone.utc),
                     }
 
                     try:
                         self.buffer.put_nowait(stock_data)
                         logger.debug(
-                            f"Added to buffer: {symbol} - ${price:.2f} "
-                            f"(Buffer size: {self.buffer.qsize()})"
+                            "Added to buffer: %s - $%.2f (Buffer size: %d)",
+                            symbol,
+                            price,
+                            self.buffer.qsize(),
                         )
                     except Exception as e:
                         logger.error(f"Buffer error: {str(e)}")
@@ -335,14 +345,14 @@ class FinnhubWebSocket:
         logger.info("WebSocket connection opened")
         # Reset retry count on successful connection
         self.retry_count = 0
-        self.last_sync_time = time.time()
-        self.last_pong_time = time.time()
+        now = time.monotonic()
+        self.last_sync_time = now
+        self.last_pong_time = now
         self.collected_symbols.clear()
 
-        # Subscribe to symbols with delay to avoid rate limit
+        # Subscribe to symbols; the rate limiter spaces out the requests
         for symbol in self.symbols:
             self.rate_limiter.wait_if_needed()
-            time.sleep(0.5)  # Her istek arasında yarım saniye bekle
             ws.send(json.dumps({"type": "subscribe", "symbol": symbol}))
             logger.info(f"Subscription started for {symbol}")
 
@@ -365,7 +375,7 @@ class FinnhubWebSocket:
             message: Pong message
         """
         logger.debug("Received pong")
-        self.last_pong_time = time.time()
+        self.last_pong_time = time.monotonic()
 
     def check_connection(self) -> None:
         """Monitor connection health.
@@ -376,7 +386,7 @@ class FinnhubWebSocket:
         ping_failures = 0
         while True:
             try:
-                now = time.time()
+                now = time.monotonic()
                 if now - self.last_pong_time > PING_TIMEOUT:
                     ping_failures += 1
                     logger.warning(
@@ -398,8 +408,8 @@ class FinnhubWebSocket:
     def run(self) -> None:
         """Start the application.
 
-        Create connection health check and buffer monitor threads,
-        then start WebSocket connection.
+        Create connection health check, buffer monitor and aggregate
+        refresher threads, then start WebSocket connection.
         """
         try:
             logger.info("Starting Finnhub WebSocket client...")
@@ -416,6 +426,12 @@ class FinnhubWebSocket:
             buffer_monitor.start()
             logger.info("Buffer monitor thread started")
 
+            # Start aggregate refresher thread
+            aggregate_refresher = threading.Thread(target=self.aggregate_refresher)
+            aggregate_refresher.daemon = True
+            aggregate_refresher.start()
+            logger.info("Aggregate refresher thread started")
+
             while True:
                 try:
                     if self.ws:
@@ -1,7 +1,7 @@
 """Module for checking data quality in the database."""
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Tuple
 
 from sqlalchemy import text
@@ -32,7 +32,7 @@ def get_data_stats(db: PostgresManager) -> Dict[str, float]:
                     """
                 SELECT
                     COUNT(*) as total_records,
-                    COUNT(DISTINCT symbol) as unique_symbols,
+                    COUNT(DISTINCT symbol_id) as unique_symbols,
                     AVG(price) as avg_price,
                     MIN(price) as min_price,
                     MAX(price) as max_price,
@@ -61,20 +61,21 @@ def check_data_distribution(db: PostgresManager) -> None:
     try:
         session = db._get_session()
         try:
-            cutoff_time = datetime.now() - timedelta(minutes=5)
+            cutoff_time = datetime.now(timezone.utc) - timedelta(minutes=5)
             result = session.execute(
                 text(
                     """
                 WITH time_diffs AS (
                     SELECT
-                        symbol,
-                        collected_at,
+                        s.symbol,
+                        d.collected_at,
                         EXTRACT(EPOCH FROM
-                            collected_at - LAG(collected_at)
-                            OVER (PARTITION BY symbol ORDER BY collected_at)
+                            d.collected_at - LAG(d.collected_at)
+                            OVER (PARTITION BY d.symbol_id ORDER BY d.collected_at)
                         ) as interval_seconds
-                    FROM stock_data
-                    WHERE collected_at > :cutoff
+                    FROM stock_data d
+                    JOIN symbols s ON s.id = d.symbol_id
+                    WHERE d.collected_at > :cutoff
                 )
                 SELECT
                     symbol,
@@ -128,7 +129,7 @@ def check_data_quality(db: PostgresManager) -> List[str]:
                 FROM stock_data
                 WHERE price IS NULL
                 OR volume IS NULL
-                OR symbol IS NULL;
+                OR symbol_id IS NULL;
             """
                 )
             )
@@ -153,11 +154,11 @@ def check_data_quality(db: PostgresManager) -> List[str]:
                     """
                 WITH time_diffs AS (
                     SELECT
-                        symbol,
+                        symbol_id,
                         collected_at,
                         EXTRACT(EPOCH FROM
                             collected_at - LAG(collected_at)
-                            OVER (PARTITION BY symbol ORDER BY collected_at)
+                            OVER (PARTITION BY symbol_id ORDER BY collected_at)
                         ) as interval_seconds
                     FROM stock_data
                 )
@@ -203,10 +204,10 @@ def get_missing_periods(
         session = db._get_session()
         try:
             symbols = session.execute(
-                text("SELECT DISTINCT symbol FROM stock_data;")
-            ).scalars()
+                text("SELECT id, symbol FROM symbols;")
+            ).all()
 
-            for symbol in symbols:
+            for symbol_id, symbol in symbols:
                 result = session.execute(
                     text(
                         """
@@ -216,11 +217,11 @@ def get_missing_periods(
                             ORDER BY collected_at
                         ) as next_time
                     FROM stock_data
-                    WHERE symbol = :symbol
+                    WHERE symbol_id = :symbol_id
                     ORDER BY collected_at;
                 """
                     ),
-                    {"symbol": symbol},
+                    {"symbol_id": symbol_id},
                 )
 
                 for row in result:
@@ -6,16 +6,33 @@ management and data insertion.
 
 import logging
 import os
-from datetime import datetime
-from typing import Dict, Optional, Union, List, Any
+import selectors
+from datetime import datetime, timezone
+from typing import Dict, Generator, Mapping, Optional, Sequence, Union, List, Any
 
 import psycopg2
 from dotenv import load_dotenv
 from psycopg2 import Error as PostgresError
 from psycopg2.extensions import connection, cursor
-from sqlalchemy import Column, DateTime, Float, Integer, String, create_engine, text
+from sqlalchemy import (
+    REAL,
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    URL,
+    String,
+    create_engine,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
 
 # Load environment variables
 load_dotenv()
@@ -25,18 +42,73 @@ logger = logging.getLogger(__name__)
 # Type hint for stock data dictionary
 StockDataDict = Dict[str, Union[str, float, datetime]]
 
+# Channel the stock_data insert trigger publishes new rows on
+NOTIFY_CHANNEL = "stock_data_new"
+
+# Log only every Nth successful single-row insert
+INSERT_LOG_EVERY = 1000
+
+# 1 minute averages the dashboard reads for multi-hour ranges
+AGGREGATE_VIEW = "stock_data_1m"
+AGGREGATE_VIEW_DDL = f"""
+    CREATE MATERIALIZED VIEW IF NOT EXISTS {AGGREGATE_VIEW} AS
+    SELECT symbol_id,
+           date_trunc('minute', collected_at) AS bucket,
+           AVG(price) AS price,
+           SUM(volume)::BIGINT AS volume,
+           MAX(timestamp) AS timestamp
+    FROM stock_data
+    GROUP BY symbol_id, date_trunc('minute', collected_at);
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_{AGGREGATE_VIEW}
+    ON {AGGREGATE_VIEW}(symbol_id, bucket);
+"""
+
 # Using new SQLAlchemy 2.0 style
 Base = declarative_base()
 
+
+class Symbol(Base):
+    __tablename__ = 'symbols'
+
+    id = Column(SmallInteger, primary_key=True)
+    symbol = Column(String(10), unique=True, nullable=False)
+
+
 class StockData(Base):
     __tablename__ = 'stock_data'
     
     id = Column(Integer, primary_key=True)
-    symbol = Column(String)
-    price = Column(Float)
-    volume = Column(Float)
-    timestamp = Column(DateTime)
-    collected_at = Column(DateTime)
+    symbol_id = Column(SmallInteger, ForeignKey('symbols.id'), nullable=False)
+    price = Column(REAL)
+    volume = Column(BigInteger)
+    timestamp = Column(DateTime(timezone=True))
+    collected_at = Column(DateTime(timezone=True))
+
+    # Rows arrive in collected_at order, so a BRIN index prunes time ranges
+    # at a fraction of the size and insert cost of a B-tree.
+    __table_args__ = (
+        Index(
+            'idx_stock_collected_at_brin',
+            'collected_at',
+            postgresql_using='brin',
+            postgresql_with={'pages_per_range': 32},
+        ),
+        # Serves the dashboard's per-symbol range scans as index-only scans
+        Index(
+            'idx_stock_symbol_ts',
+            'symbol_id',
+            text('collected_at DESC'),
+            postgresql_include=['price', 'volume', 'timestamp'],
+        ),
+    )
+
+
+# Built once so every insert reuses SQLAlchemy's cached compiled form;
+# RETURNING hands back generated ids in the same round-trip as the INSERT
+_INSERT_STMT = insert(StockData).returning(
+    StockData.id, sort_by_parameter_order=True
+)
+
 
 class PostgresManager:
     """Manages PostgreSQL database operations."""
@@ -52,10 +124,24 @@ class PostgresManager:
 
         try:
             # Create SQLAlchemy engine and session
-            self.database_url = f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.db_name}"
+            self.database_url = URL.create(
+                drivername="postgresql",
+                username=self.user,
+                password=self.password,
+                host=self.host,
+                port=self.port,
+                database=self.db_name,
+            )
             logger.info(f"Connecting to database at {self.host}:{self.port}")
             self.engine = create_engine(self.database_url)
             self.Session = sessionmaker(bind=self.engine)
+            # Thread-local session reused across calls on the hot paths
+            self._scoped = scoped_session(self.Session)
+            # Symbol -> symbols.id cache, filled on first sight of a symbol
+            self._symbol_ids: Dict[str, int] = {}
+            # Reverse of _symbol_ids for turning notifications into symbols
+            self._symbol_names: Dict[int, str] = {}
+            self._insert_count = 0
 
             # Create tables
             Base.metadata.create_all(self.engine)
@@ -86,17 +172,41 @@ class PostgresManager:
             self.connect()
             if self.cur:
                 self.cur.execute("""
+                    CREATE TABLE IF NOT EXISTS symbols (
+                        id SMALLSERIAL PRIMARY KEY,
+                        symbol VARCHAR(10) NOT NULL UNIQUE
+                    );
                     CREATE TABLE IF NOT EXISTS stock_data (
                         id SERIAL PRIMARY KEY,
-                        symbol VARCHAR(10) NOT NULL,
-                        price DECIMAL(10,2) NOT NULL,
-                        volume DECIMAL(15,2) NOT NULL,
-                        timestamp TIMESTAMP NOT NULL,
-                        collected_at TIMESTAMP NOT NULL
+                        symbol_id SMALLINT NOT NULL REFERENCES symbols(id),
+                        price REAL NOT NULL,
+                        volume BIGINT NOT NULL,
+                        timestamp TIMESTAMPTZ NOT NULL,
+                        collected_at TIMESTAMPTZ NOT NULL
                     );
                     CREATE INDEX IF NOT EXISTS idx_symbol_timestamp 
-                    ON stock_data(symbol, timestamp);
+                    ON stock_data(symbol_id, timestamp);
+                    CREATE INDEX IF NOT EXISTS idx_stock_collected_at_brin
+                    ON stock_data USING BRIN (collected_at)
+                    WITH (pages_per_range = 32);
+                    CREATE INDEX IF NOT EXISTS idx_stock_symbol_ts
+                    ON stock_data(symbol_id, collected_at DESC)
+                    INCLUDE (price, volume, timestamp);
+
+                    CREATE OR REPLACE FUNCTION notify_stock() RETURNS trigger AS $$
+                    BEGIN
+                        PERFORM pg_notify(
+                            'stock_data_new', NEW.symbol_id || ':' || NEW.price
+                        );
+                        RETURN NEW;
+                    END
+                    $$ LANGUAGE plpgsql;
+                    DROP TRIGGER IF EXISTS stock_data_notify ON stock_data;
+                    CREATE TRIGGER stock_data_notify
+                    AFTER INSERT ON stock_data
+                    FOR EACH ROW EXECUTE FUNCTION notify_stock();
                 """)
+                self.cur.execute(AGGREGATE_VIEW_DDL)
                 if self.conn:
                     self.conn.commit()
                 logger.info("Stock data table created/verified successfully")
@@ -106,63 +216,240 @@ class PostgresManager:
         finally:
             self.close()
 
-    def insert_stock_data(self, data: Dict[str, Any]) -> Optional[bool]:
+    def refresh_aggregates(self) -> bool:
+        """
+        Refresh the 1 minute aggregate view.
+
+        CONCURRENTLY keeps the view readable by the dashboard while it
+        is being rebuilt.
+
+        Returns:
+            bool: True if the view was refreshed
+        """
         try:
-            # Validate data before insertion
-            if not self._validate_stock_data(data):
-                logger.error(f"❌ Data validation failed. Missing or invalid fields in: {data}")
+            with self._scoped() as session, session.begin():
+                session.execute(
+                    text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {AGGREGATE_VIEW}")
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error refreshing {AGGREGATE_VIEW}: {e}")
+            return False
+
+    def insert_stock_data(self, data: Mapping[str, Any]) -> Optional[bool]:
+        try:
+            row = self._prepare_row(data)
+            if row is None:
                 return None
 
-            # Convert timestamp string to datetime if it's a string
-            if isinstance(data["timestamp"], str):
-                try:
-                    data["timestamp"] = datetime.strptime(data["timestamp"], "%Y-%m-%d %H:%M:%S")
-                    logger.debug(f"Converted timestamp: {data['timestamp']}")
-                except ValueError as e:
-                    logger.error(f"❌ Timestamp conversion error for {data['symbol']}: {e}")
-                    logger.error(f"Problematic timestamp: {data['timestamp']}")
-                    return None
-
-            # Convert collected_at to datetime if it's a string
-            if isinstance(data["collected_at"], str):
-                try:
-                    # First try ISO format
-                    try:
-                        data["collected_at"] = datetime.fromisoformat(data["collected_at"])
-                    except ValueError:
-                        # If ISO format fails, try the standard format
-                        data["collected_at"] = datetime.strptime(data["collected_at"], "%Y-%m-%d %H:%M:%S")
-                    logger.debug(f"Converted collected_at: {data['collected_at']}")
-                except ValueError as e:
-                    logger.error(f"❌ Collected_at conversion error for {data['symbol']}: {e}")
-                    logger.error(f"Problematic collected_at: {data['collected_at']}")
-                    return None
-
-            session = self.Session()
             try:
-                stock_data = StockData(
-                    symbol=str(data["symbol"]),
-                    price=float(data["price"]),
-                    volume=float(data["volume"]),
-                    timestamp=data["timestamp"],
-                    collected_at=data["collected_at"]
-                )
-                session.add(stock_data)
-                session.commit()
-                logger.info(f"✅ Successfully inserted {data['symbol']} data into database")
+                with self._scoped() as session, session.begin():
+                    stock_data_id = session.execute(_INSERT_STMT, row).scalar_one()
+                self._insert_count += 1
+                if self._insert_count % INSERT_LOG_EVERY == 0:
+                    logger.info(
+                        "✅ Successfully inserted %s data into database, ID: %s "
+                        "(%d inserts)",
+                        data["symbol"],
+                        stock_data_id,
+                        self._insert_count,
+                    )
                 return True
             except Exception as e:
-                session.rollback()
-                logger.error(f"❌ Database insertion error for {data['symbol']}: {e}")
+                logger.error("❌ Database insertion error for %s: %s", data["symbol"], e)
                 return None
-            finally:
-                session.close()
         except Exception as e:
-            logger.error(f"❌ General error in insert_stock_data: {e}")
-            logger.error(f"Problematic data: {data}")
+            logger.error("❌ General error in insert_stock_data: %s", e)
+            logger.error("Problematic data: %s", data)
             return None
 
-    def _validate_stock_data(self, data: Dict[str, Any]) -> bool:
+    def bulk_insert_stock_data(
+        self, data_list: Sequence[Mapping[str, Any]]
+    ) -> List[int]:
+        """Insert many stock data rows with a single statement.
+
+        Rows that fail validation or symbol lookup are skipped and
+        logged. If the batch INSERT fails, the rows are inserted one at
+        a time so a single bad row does not cost the whole batch.
+
+        Args:
+            data_list: Stock data mappings to insert
+
+        Returns:
+            List[int]: Ids of the inserted rows, in insertion order
+        """
+        rows = [row for row in map(self._prepare_row, data_list) if row is not None]
+        if not rows:
+            return []
+
+        try:
+            with self._scoped() as session, session.begin():
+                ids = list(session.execute(_INSERT_STMT, rows).scalars())
+        except Exception as e:
+            logger.error(
+                "❌ Bulk insertion error, inserting %d rows one by one: %s",
+                len(rows),
+                e,
+            )
+            ids = self._insert_rows(rows)
+
+        self._insert_count += len(ids)
+        logger.info("✅ Successfully inserted %d rows into database", len(ids))
+        return ids
+
+    def _insert_rows(self, rows: Sequence[Dict[str, Any]]) -> List[int]:
+        """Insert prepared rows one transaction each, skipping failures.
+
+        Args:
+            rows: Column values built by _prepare_row
+
+        Returns:
+            List[int]: Ids of the rows that were inserted
+        """
+        ids = []
+        for row in rows:
+            try:
+                with self._scoped() as session, session.begin():
+                    ids.append(session.execute(_INSERT_STMT, row).scalar_one())
+            except Exception as e:
+                logger.error("❌ Database insertion error for %s: %s", row, e)
+        return ids
+
+    def _prepare_row(self, data: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        """Validate stock data and convert it to a stock_data row.
+
+        Args:
+            data: Stock data to convert
+
+        Returns:
+            Optional[Dict[str, Any]]: Column values, or None if invalid
+        """
+        # Validate data before insertion
+        if not self._validate_stock_data(data):
+            logger.error(
+                "❌ Data validation failed. Missing or invalid fields in: %s", data
+            )
+            return None
+
+        # Convert timestamp string to datetime if it's a string
+        timestamp = data["timestamp"]
+        if isinstance(timestamp, str):
+            try:
+                timestamp = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+                logger.debug("Converted timestamp: %s", timestamp)
+            except ValueError as e:
+                logger.error(
+                    "❌ Timestamp conversion error for %s: %s", data["symbol"], e
+                )
+                logger.error("Problematic timestamp: %s", timestamp)
+                return None
+
+        # Convert collected_at to datetime if it's a string
+        collected_at = data["collected_at"]
+        if isinstance(collected_at, str):
+            try:
+                # First try ISO format
+                try:
+                    collected_at = datetime.fromisoformat(collected_at)
+                except ValueError:
+                    # If ISO format fails, try the standard format
+                    collected_at = datetime.strptime(collected_at, "%Y-%m-%d %H:%M:%S")
+                logger.debug("Converted collected_at: %s", collected_at)
+            except ValueError as e:
+                logger.error(
+                    "❌ Collected_at conversion error for %s: %s", data["symbol"], e
+                )
+                logger.error("Problematic collected_at: %s", collected_at)
+                return None
+
+        # Naive values are taken as UTC, otherwise TIMESTAMPTZ would read
+        # them in the session time zone
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        if collected_at.tzinfo is None:
+            collected_at = collected_at.replace(tzinfo=timezone.utc)
+
+        try:
+            symbol_id = self._get_symbol_id(str(data["symbol"]))
+        except Exception as e:
+            logger.error("❌ Symbol lookup error for %s: %s", data["symbol"], e)
+            return None
+
+        return {
+            "symbol_id": symbol_id,
+            "price": float(data["price"]),
+            "volume": int(float(data["volume"])),
+            "timestamp": timestamp,
+            "collected_at": collected_at,
+        }
+
+    def _get_session(self) -> Session:
+        """Return the thread-local session.
+
+        Callers close it when done; closing releases the connection but
+        keeps the session registered for reuse on the next call.
+
+        Returns:
+            Session: SQLAlchemy session for the current thread
+        """
+        return self._scoped()
+
+    def _get_symbol_id(self, symbol: str) -> int:
+        """Return the symbols.id for a symbol, creating the row if needed.
+
+        Ids are cached after the first lookup, so the steady-state insert
+        path does not touch the symbols table at all.
+
+        Args:
+            symbol: Stock symbol
+
+        Returns:
+            int: Id of the symbol in the symbols table
+        """
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is not None:
+            return symbol_id
+
+        with self._scoped() as session, session.begin():
+            symbol_id = session.execute(
+                pg_insert(Symbol)
+                .values(symbol=symbol)
+                .on_conflict_do_nothing(index_elements=[Symbol.symbol])
+                .returning(Symbol.id)
+            ).scalar()
+            if symbol_id is None:
+                # Row already existed, ON CONFLICT DO NOTHING returns nothing
+                symbol_id = session.execute(
+                    select(Symbol.id).where(Symbol.symbol == symbol)
+                ).scalar_one()
+
+        self._symbol_ids[symbol] = symbol_id
+        self._symbol_names[symbol_id] = symbol
+        return symbol_id
+
+    def _get_symbol_name(self, symbol_id: int) -> str:
+        """Return the symbol for a symbols.id, using the id cache first.
+
+        Args:
+            symbol_id: Id of the symbol in the symbols table
+
+        Returns:
+            str: Stock symbol
+        """
+        symbol = self._symbol_names.get(symbol_id)
+        if symbol is not None:
+            return symbol
+
+        with self._scoped() as session:
+            symbol = session.execute(
+                select(Symbol.symbol).where(Symbol.id == symbol_id)
+            ).scalar_one()
+
+        self._symbol_ids[symbol] = symbol_id
+        self._symbol_names[symbol_id] = symbol
+        return symbol
+
+    def _validate_stock_data(self, data: Mapping[str, Any]) -> bool:
         """Validate stock data before insertion.
 
         Args:
@@ -199,22 +486,61 @@ class PostgresManager:
             logger.error(f"Error closing database connection: {e}")
 
     def get_latest_records(self, limit: int = 10) -> List[Dict[str, Any]]:
-        session = self.Session()
-        try:
-            records = session.query(StockData)\
+        with self._scoped() as session:
+            records = session.query(StockData, Symbol.symbol)\
+                .join(Symbol)\
                 .order_by(StockData.timestamp.desc())\
                 .limit(limit)\
                 .all()
             
             return [
                 {
-                    "symbol": record.symbol,
+                    "symbol": symbol,
                     "price": record.price,
                     "volume": record.volume,
                     "timestamp": record.timestamp,
                     "collected_at": record.collected_at
                 }
-                for record in records
+                for record, symbol in records
             ]
+
+    def subscribe(self, timeout: float = 5.0) -> Generator[Dict[str, Any], None, None]:
+        """Yield new stock data as the database announces it.
+
+        Listens on the channel fed by the stock_data insert trigger, so
+        consumers get pushed each new row instead of polling
+        get_latest_records.
+
+        Args:
+            timeout: Seconds to wait on the socket between checks
+
+        Yields:
+            Dict[str, Any]: Symbol and price of each inserted row
+        """
+        conn = psycopg2.connect(
+            host=self.host,
+            port=self.port,
+            dbname=self.db_name,
+            user=self.user,
+            password=self.password
+        )
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+
+            with selectors.DefaultSelector() as selector:
+                selector.register(conn, selectors.EVENT_READ)
+                while True:
+                    if not selector.select(timeout):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        symbol_id, price = notify.payload.split(":", 1)
+                        yield {
+                            "symbol": self._get_symbol_name(int(symbol_id)),
+                            "price": float(price),
+                        }
         finally:
-            session.close()
+            conn.close()
@@ -5,7 +5,7 @@ import os
 from typing import Optional
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import URL, create_engine, text
 from sqlalchemy.engine.base import Engine
 
 logger = logging.getLogger(__name__)
@@ -21,12 +21,13 @@ def get_db_connection() -> Optional[Engine]:
         Optional[Engine]: SQLAlchemy engine object or None
     """
     try:
-        db_url = (
-            f"postgresql://{os.getenv('POSTGRES_USER')}:"
-            f"{os.getenv('POSTGRES_PASSWORD')}@"
-            f"{os.getenv('POSTGRES_HOST')}:"
-            f"{os.getenv('POSTGRES_PORT')}/"
-            f"{os.getenv('POSTGRES_DB')}"
+        db_url = URL.create(
+            drivername="postgresql",
+            username=os.getenv("POSTGRES_USER"),
+            password=os.getenv("POSTGRES_PASSWORD"),
+            host=os.getenv("POSTGRES_HOST"),
+            port=int(os.getenv("POSTGRES_PORT", "5432")),
+            database=os.getenv("POSTGRES_DB"),
         )
         return create_engine(db_url)
     except Exception as e:
@@ -60,19 +61,30 @@ def reset_database(engine: Engine) -> bool:
 
         with engine.connect() as conn:
             conn.execute(text("DROP TABLE IF EXISTS stock_data CASCADE;"))
+            conn.execute(text("DROP TABLE IF EXISTS symbols CASCADE;"))
             conn.commit()
 
         with engine.connect() as conn:
+            conn.execute(
+                text(
+                    """
+                CREATE TABLE symbols (
+                    id SMALLSERIAL PRIMARY KEY,
+                    symbol VARCHAR(10) NOT NULL UNIQUE
+                );
+            """
+                )
+            )
             conn.execute(
                 text(
                     """
                 CREATE TABLE stock_data (
                     id SERIAL PRIMARY KEY,
-                    symbol VARCHAR(10) NOT NULL,
-                    price FLOAT NOT NULL,
-                    volume FLOAT,
-                    timestamp TIMESTAMP NOT NULL,
-                    collected_at TIMESTAMP NOT NULL
+                    symbol_id SMALLINT NOT NULL REFERENCES symbols(id),
+                    price REAL NOT NULL,
+                    volume BIGINT,
+                    timestamp TIMESTAMPTZ NOT NULL,
+                    collected_at TIMESTAMPTZ NOT NULL
                 );
             """
                 )
@@ -81,16 +93,63 @@ def reset_database(engine: Engine) -> bool:
             conn.execute(
                 text(
                     """
-                CREATE INDEX idx_stock_symbol
-                ON stock_data(symbol);
+                CREATE INDEX idx_stock_symbol_ts
+                ON stock_data(symbol_id, collected_at DESC)
+                INCLUDE (price, volume, timestamp);
+            """
+                )
+            )
+            conn.execute(
+                text(
+                    """
+                CREATE INDEX idx_stock_collected_at_brin
+                ON stock_data USING BRIN (collected_at)
+                WITH (pages_per_range = 32);
+            """
+                )
+            )
+            conn.execute(
+                text(
+                    """
+                CREATE OR REPLACE FUNCTION notify_stock() RETURNS trigger AS $$
+                BEGIN
+                    PERFORM pg_notify(
+                        'stock_data_new', NEW.symbol_id || ':' || NEW.price
+                    );
+                    RETURN NEW;
+                END
+                $$ LANGUAGE plpgsql;
+            """
+                )
+            )
+            conn.execute(
+                text(
+                    """
+                CREATE TRIGGER stock_data_notify
+                AFTER INSERT ON stock_data
+                FOR EACH ROW EXECUTE FUNCTION notify_stock();
+            """
+                )
+            )
+            conn.execute(
+                text(
+                    """
+                CREATE MATERIALIZED VIEW stock_data_1m AS
+                SELECT symbol_id,
+                       date_trunc('minute', collected_at) AS bucket,
+                       AVG(price) AS price,
+                       SUM(volume)::BIGINT AS volume,
+                       MAX(timestamp) AS timestamp
+                FROM stock_data
+                GROUP BY symbol_id, date_trunc('minute', collected_at);
             """
                 )
             )
             conn.execute(
                 text(
                     """
-                CREATE INDEX idx_stock_timestamp
-                ON stock_data(timestamp);
+                CREATE UNIQUE INDEX idx_stock_data_1m
+                ON stock_data_1m(symbol_id, bucket);
             """
                 )
             )
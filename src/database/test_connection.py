@@ -5,7 +5,7 @@ import os
 from typing import Optional, Tuple
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, text
+from sqlalchemy import URL, create_engine, text
 from sqlalchemy.engine.base import Engine
 
 logger = logging.getLogger(__name__)
@@ -21,12 +21,13 @@ def get_db_connection() -> Optional[Engine]:
         Optional[Engine]: SQLAlchemy engine object or None
     """
     try:
-        db_url = (
-            f"postgresql://{os.getenv('POSTGRES_USER')}:"
-            f"{os.getenv('POSTGRES_PASSWORD')}@"
-            f"{os.getenv('POSTGRES_HOST')}:"
-            f"{os.getenv('POSTGRES_PORT')}/"
-            f"{os.getenv('POSTGRES_DB')}"
+        db_url = URL.create(
+            drivername="postgresql",
+            username=os.getenv("POSTGRES_USER"),
+            password=os.getenv("POSTGRES_PASSWORD"),
+            host=os.getenv("POSTGRES_HOST"),
+            port=int(os.getenv("POSTGRES_PORT", "5432")),
+            database=os.getenv("POSTGRES_DB"),
         )
         return create_engine(db_url)
     except Exception as e:
@@ -85,18 +86,11 @@ def check_table_exists(engine: Engine, table_name: str) -> bool:
     """
     try:
         with engine.connect() as conn:
+            # to_regclass is a single catalog lookup, unlike the
+            # information_schema.tables view
             result = conn.execute(
-                text(
-                    """
-                SELECT EXISTS (
-                    SELECT 1
-                    FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                    AND table_name = :table_name
-                );
-            """
-                ),
-                {"table_name": table_name},
+                text("SELECT to_regclass(:table_name) IS NOT NULL;"),
+                {"table_name": f"public.{table_name}"},
             )
             exists: bool = bool(result.scalar())
             return exists
@@ -5,9 +5,8 @@ exceeding API rate limits.
 """
 
 import logging
+import threading
 import time
-from collections import deque
-from typing import Deque
 
 logger = logging.getLogger(__name__)
 
@@ -29,26 +28,42 @@ class RateLimiter:
 
         self.max_requests = max_requests
         self.time_window = time_window
-        self.requests: Deque[float] = deque()
+        # Tokens refill continuously at rate per second, capped at max_requests
+        self.rate = max_requests / time_window
+        self.tokens = float(max_requests)
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Refill the bucket as if the limiter had just been created."""
+        with self._lock:
+            self.tokens = float(self.max_requests)
+            self.last_refill = time.monotonic()
 
     def wait_if_needed(self) -> None:
-        """Wait if rate limit is exceeded."""
-        now = time.time()
-
-        # Remove old requests
-        while self.requests and now - self.requests[0] > self.time_window:
-            self.requests.popleft()
-
-        # If we've hit the limit, wait
-        if len(self.requests) >= self.max_requests:
-            wait_time = self.requests[0] + self.time_window - now
-            if wait_time > 0:
-                logger.info(f"Rate limit reached. Waiting {wait_time:.2f} seconds...")
-                time.sleep(wait_time)
-                # After waiting, remove old requests again
-                now = time.time()
-                while self.requests and now - self.requests[0] > self.time_window:
-                    self.requests.popleft()
-
-        # Add current request
-        self.requests.append(now)
+        """Wait if rate limit is exceeded.
+
+        Safe to call from several threads. The lock only guards the
+        bucket update and is released while waiting, so callers sleep
+        in parallel instead of queueing behind each other's sleeps.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+
+                # Refill tokens for the time since the last call
+                self.tokens = min(
+                    self.max_requests,
+                    self.tokens + (now - self.last_refill) * self.rate,
+                )
+                self.last_refill = now
+
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+
+                # Bucket is empty, wait for the next token and try again
+                wait_time = (1.0 - self.tokens) / self.rate
+
+            logger.info(f"Rate limit reached. Waiting {wait_time:.2f} seconds...")
+            time.sleep(wait_time)
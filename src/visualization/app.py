@@ -2,26 +2,106 @@
 
 import logging
 import os
-import time
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import URL, create_engine
 from sqlalchemy.engine.base import Engine
 
 CACHE_TTL = 1
+SYMBOLS_CACHE_TTL = 300
 REFRESH_INTERVAL = 1
 DEFAULT_HOURS = 1
 MAX_HOURS = 24
+POOL_SIZE = 2
+POOL_RECYCLE = 1800
+MAX_OVERFLOW = 0
+STATEMENT_TIMEOUT_MS = 5000
+MA_WINDOW = timedelta(minutes=5)
+MAX_CHART_POINTS = 2000
+BUCKET_MIN_HOURS = 2
+# Rows reach the table in buffer flushes from two threads, so a row can
+# be committed after newer ones; each refresh reads this far back again
+LATE_ROW_WINDOW = timedelta(seconds=30)
+
+# Labels and browser-side formats of the recent rows table, so the
+# frame is shown as loaded without renaming or formatting it. Number
+# columns without a printf format keep thousands separators, with as
+# many decimals as the step has.
+TABLE_COLUMNS = {
+    "collected_at": st.column_config.DatetimeColumn("Time", format="HH:mm:ss.SS"),
+    "price": st.column_config.NumberColumn("Price ($)", step=0.01),
+    "volume": st.column_config.NumberColumn("Volume", step=1),
+}
 
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+_DB_URL = URL.create(
+    drivername="postgresql",
+    username=os.getenv("POSTGRES_USER"),
+    password=os.getenv("POSTGRES_PASSWORD"),
+    host=os.getenv("POSTGRES_HOST"),
+    port=int(os.getenv("POSTGRES_PORT", "5432")),
+    database=os.getenv("POSTGRES_DB"),
+)
+
+# Query texts are built once so every call sends the identical statement
+SYMBOLS_QUERY = "SELECT symbol FROM symbols ORDER BY symbol"
+# First and last rows are single index probes on idx_stock_symbol_ts,
+# so the cost does not grow with the window
+STATS_QUERY = (
+    "SELECT l.price AS last_price, f.price AS first_price, "
+    "a.avg_price, l.volume AS last_volume "
+    "FROM symbols s "
+    "LEFT JOIN LATERAL (SELECT d.price, d.volume FROM stock_data d "
+    "WHERE d.symbol_id = s.id AND d.collected_at > %(cutoff)s "
+    "ORDER BY d.collected_at DESC LIMIT 1) l ON true "
+    "LEFT JOIN LATERAL (SELECT d.price FROM stock_data d "
+    "WHERE d.symbol_id = s.id AND d.collected_at > %(cutoff)s "
+    "ORDER BY d.collected_at LIMIT 1) f ON true "
+    "LEFT JOIN LATERAL (SELECT AVG(d.price) AS avg_price FROM stock_data d "
+    "WHERE d.symbol_id = s.id AND d.collected_at > %(cutoff)s) a ON true "
+    "WHERE s.symbol = %(symbol)s"
+)
+TABLE_QUERY = (
+    "SELECT d.collected_at, d.price, d.volume "
+    "FROM stock_data d "
+    "JOIN symbols s ON s.id = d.symbol_id "
+    "WHERE s.symbol = %(symbol)s "
+    "ORDER BY d.collected_at DESC "
+    "LIMIT %(limit)s"
+)
+# Served by idx_stock_symbol_ts (symbol_id, collected_at DESC)
+CHART_QUERY = (
+    "SELECT d.id, s.symbol, d.price, d.volume, d.timestamp, d.collected_at "
+    "FROM stock_data d "
+    "JOIN symbols s ON s.id = d.symbol_id "
+    "WHERE d.collected_at > %(since)s "
+    "AND s.symbol = %(symbol)s "
+    "ORDER BY d.collected_at, d.id"
+)
+BUCKET_QUERY = (
+    "SELECT s.symbol, m.price, m.volume, m.timestamp, m.bucket AS collected_at "
+    "FROM stock_data_1m m "
+    "JOIN symbols s ON s.id = m.symbol_id "
+    "WHERE m.bucket > %(since)s "
+    "AND s.symbol = %(symbol)s "
+    "ORDER BY m.bucket"
+)
+SCHEMA_HINTS = (
+    "CREATE INDEX IF NOT EXISTS idx_stock_symbol_ts "
+    "ON stock_data (symbol_id, collected_at DESC) "
+    "INCLUDE (price, volume, timestamp)"
+)
+
 st.set_page_config(
     page_title="Stock Tracker",
     page_icon="📈",
@@ -49,96 +129,301 @@ st.markdown(
 def get_db_connection() -> Optional[Engine]:
     """Create database connection."""
     try:
-        user = os.getenv("POSTGRES_USER")
-        pwd = os.getenv("POSTGRES_PASSWORD")
-        host = os.getenv("POSTGRES_HOST")
-        port = os.getenv("POSTGRES_PORT")
-        db = os.getenv("POSTGRES_DB")
-
-        url = f"postgresql://{user}:{pwd}@{host}:{port}/{db}"
-        return create_engine(url)
+        return create_engine(
+            _DB_URL,
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=True,
+            connect_args={"options": f"-c statement_timeout={STATEMENT_TIMEOUT_MS}"},
+        )
     except Exception as e:
         st.error(f"Database connection error: {str(e)}")
         return None
 
 
-@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
-def load_data(_engine: Engine, hours: int = DEFAULT_HOURS) -> pd.DataFrame:
-    """Load data for last n hours."""
+@st.cache_resource
+def apply_schema_hints(_engine: Engine, symbol: str) -> None:
+    """Create the chart query index and log the query plan once."""
     try:
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        with _engine.begin() as conn:
+            # Building the index may outlast the dashboard's query timeout
+            conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
+            conn.exec_driver_sql(SCHEMA_HINTS)
+            since = datetime.now(timezone.utc) - timedelta(hours=DEFAULT_HOURS)
+            plan = conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS) " + CHART_QUERY,
+                {"since": since, "symbol": symbol},
+            ).scalars().all()
+        logger.info("Chart query plan:\n" + "\n".join(plan))
+    except Exception as e:
+        logger.error(f"Schema hints could not be applied: {str(e)}")
 
-        fields = ["symbol", "price", "volume", "timestamp", "collected_at"]
-        select_fields = ", ".join(fields)
-        window_start = "AVG(price) OVER (PARTITION BY symbol"
-        window_end = "ORDER BY collected_at "
 
-        select_base = f"SELECT {select_fields}"
-        window_full = f"{window_start} {window_end}"
-        select_clause = f"{select_base}, {window_full}"
+@st.cache_data(ttl=SYMBOLS_CACHE_TTL, show_spinner=False)
+def load_symbols(_engine: Engine) -> list[str]:
+    """Load the list of tracked symbols."""
+    try:
+        return list(pd.read_sql_query(SYMBOLS_QUERY, _engine)["symbol"])
+    except Exception as e:
+        st.error(f"Symbol loading error: {str(e)}")
+        return []
 
-        window_clause = (
-            "RANGE BETWEEN INTERVAL '5 minutes' PRECEDING AND CURRENT ROW"
-            ") as price_ma_5 "
-        )
-        from_clause = (
-            "FROM stock_data "
-            "WHERE collected_at > %(cutoff)s "
-            "ORDER BY collected_at DESC"
-        )
 
-        query = select_clause + window_clause + from_clause
+def load_data(_engine: Engine, symbol: str, since: datetime) -> pd.DataFrame:
+    """Load chart rows of one symbol collected after `since`, oldest first.
 
-        params = {"cutoff": cutoff_time}
+    Not cached: `since` moves forward on every refresh, so each call only
+    fetches the rows that arrived after the previous one.
+    """
+    try:
+        params = {"since": since, "symbol": symbol}
         date_cols = ["timestamp", "collected_at"]
 
         df = pd.read_sql_query(
-            query,
+            CHART_QUERY,
             _engine,
             params=params,
             parse_dates=date_cols,
+            dtype_backend="pyarrow",
         )
-        return df.copy()
+        return df
     except Exception as e:
         st.error(f"Data loading error: {str(e)}")
         return pd.DataFrame()
 
 
-def get_price_change(prices: pd.Series) -> tuple[float, float]:
-    """Calculate price change."""
-    last = prices.iloc[0]
-    change = last - prices.iloc[-1]
-    return last, change
+def load_buckets(_engine: Engine, symbol: str, since: datetime) -> pd.DataFrame:
+    """Load 1 minute averages of one symbol from the aggregate view, oldest first."""
+    try:
+        params = {"since": since, "symbol": symbol}
+        date_cols = ["timestamp", "collected_at"]
+
+        return pd.read_sql_query(
+            BUCKET_QUERY,
+            _engine,
+            params=params,
+            parse_dates=date_cols,
+            dtype_backend="pyarrow",
+        )
+    except Exception as e:
+        st.error(f"Data loading error: {str(e)}")
+        return pd.DataFrame()
 
 
-def create_metrics(symbol_data: pd.DataFrame, symbol: str) -> None:
-    """Show statistics metrics."""
+def update_series(engine: Engine, symbol: str, hours: int) -> pd.DataFrame:
+    """Return chart rows of one symbol for last n hours, oldest first.
+
+    Rows and the 5 minute moving average state are kept per symbol in
+    session state. Each refresh fetches the rows collected since
+    LATE_ROW_WINDOW before the newest one seen, drops the ids it already
+    has and extends the moving average with a deque of the prices inside
+    the 5 minute window and their running sum. Rows committed late sort
+    in before rows already shown, which then get their average again.
+
+    Ranges of BUCKET_MIN_HOURS or more start from the 1 minute averages
+    of the stock_data_1m view; rows from its newest minute on are loaded
+    raw, since that minute may still have been filling up when the view
+    was last refreshed.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+
+    series = st.session_state.setdefault("series", {})
+    state = series.get(symbol)
+    history = pd.DataFrame()
+    if state is None or state["hours"] != hours:
+        state = {
+            "hours": hours,
+            "frame": pd.DataFrame(),
+            "raw_from": cutoff,
+            "last_seen": cutoff,
+            "window": deque(),
+            "sum": 0.0,
+        }
+        series[symbol] = state
+
+        if hours >= BUCKET_MIN_HOURS:
+            history = load_buckets(engine, symbol, cutoff)
+            if not history.empty:
+                until = history["collected_at"].iloc[-1]
+                history = history.iloc[:-1]
+                state["raw_from"] = until - timedelta(microseconds=1)
+                state["last_seen"] = state["raw_from"]
+
+    since = max(state["last_seen"] - LATE_ROW_WINDOW, state["raw_from"])
+    new_rows = load_data(engine, symbol, since)
+    frame = state["frame"]
+    if not new_rows.empty and not frame.empty:
+        tail = frame.iloc[frame["collected_at"].searchsorted(since, side="right"):]
+        if not tail.empty:
+            new_rows = new_rows[~new_rows["id"].isin(tail["id"])]
+
+    if not new_rows.empty:
+        state["last_seen"] = max(state["last_seen"], new_rows["collected_at"].iloc[-1])
+        if not frame.empty:
+            redo_from = frame["collected_at"].searchsorted(
+                new_rows["collected_at"].iloc[0], side="right"
+            )
+            if redo_from < len(frame):
+                # Take back the rows a late one sorts in before and start
+                # the window over from the rows kept before them
+                new_rows = pd.concat(
+                    [frame.iloc[redo_from:], new_rows], ignore_index=True
+                ).sort_values(["collected_at", "id"], kind="stable")
+                frame = frame.iloc[:redo_from]
+                window_from = frame["collected_at"].searchsorted(
+                    new_rows["collected_at"].iloc[0] - MA_WINDOW, side="right"
+                )
+                kept = frame.iloc[window_from:]
+                state["window"] = deque(zip(kept["collected_at"], kept["price"]))
+                state["sum"] = float(kept["price"].sum())
+    if not history.empty:
+        new_rows = (
+            pd.concat([history, new_rows], ignore_index=True)
+            if not new_rows.empty
+            else history
+        )
+    if not new_rows.empty:
+        window = state["window"]
+        running_sum = state["sum"]
+        ma_values = []
+        for ts, price in zip(new_rows["collected_at"], new_rows["price"]):
+            window.append((ts, price))
+            running_sum += price
+            while window[0][0] <= ts - MA_WINDOW:
+                running_sum -= window.popleft()[1]
+            ma_values.append(running_sum / len(window))
+        state["sum"] = running_sum
+
+        new_rows = new_rows.assign(price_ma_5=ma_values)
+        frame = pd.concat([frame, new_rows], ignore_index=True)
+
+    if not frame.empty:
+        start = frame["collected_at"].searchsorted(cutoff, side="right")
+        frame = frame.iloc[start:]
+    state["frame"] = frame
+    return frame
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_symbol_stats(
+    _engine: Engine, symbol: str, hours: int = DEFAULT_HOURS
+) -> dict[str, Optional[float]]:
+    """Load metric values of one symbol for last n hours as one row.
+
+    Values the window has no rows for come back as None.
+    """
+    try:
+        cutoff_time = datetime.now(timezone.utc) - timedelta(hours=hours)
+
+        params = {"cutoff": cutoff_time, "symbol": symbol}
+
+        df = pd.read_sql_query(STATS_QUERY, _engine, params=params)
+        # No row when the symbol is unknown
+        if df.empty:
+            return {}
+        return {
+            name: None if pd.isna(value) else float(value)
+            for name, value in df.iloc[0].items()
+        }
+    except Exception as e:
+        st.error(f"Statistics loading error: {str(e)}")
+        return {}
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def load_recent_table(_engine: Engine, symbol: str, limit: int = 10) -> pd.DataFrame:
+    """Load the latest rows of one symbol for the table."""
+    try:
+        params = {"symbol": symbol, "limit": limit}
+
+        return pd.read_sql_query(
+            TABLE_QUERY,
+            _engine,
+            params=params,
+            parse_dates=["collected_at"],
+            dtype_backend="pyarrow",
+        )
+    except Exception as e:
+        st.error(f"Table loading error: {str(e)}")
+        return pd.DataFrame()
+
+
+def create_metrics(stats: dict[str, Optional[float]], symbol: str) -> None:
+    """Show statistics metrics, or n/a for values the window has none of."""
+    last_price = stats.get("last_price")
+    first_price = stats.get("first_price")
+    avg_price = stats.get("avg_price")
+    last_volume = stats.get("last_volume")
+
     col1, col2, col3 = st.columns(3)
     with col1:
-        last_price, change = get_price_change(symbol_data["price"])
-        st.metric("Son Fiyat", f"${last_price:.2f}", f"{change:.2f}")
+        if last_price is None:
+            st.metric("Son Fiyat", "n/a")
+        else:
+            change = None if first_price is None else f"{last_price - first_price:.2f}"
+            st.metric("Son Fiyat", f"${last_price:.2f}", change)
     with col2:
-        st.metric("Ortalama Fiyat", f"${symbol_data['price'].mean():.2f}")
+        avg_text = "n/a" if avg_price is None else f"${avg_price:.2f}"
+        st.metric("Ortalama Fiyat", avg_text)
     with col3:
-        st.metric("İşlem Hacmi", f"{symbol_data['volume'].iloc[0]:,.0f}")
+        volume_text = "n/a" if last_volume is None else f"{last_volume:,.0f}"
+        st.metric("İşlem Hacmi", volume_text)
 
 
-def create_chart(symbol_data: pd.DataFrame, symbol: str, timestamp: str) -> None:
-    """Create price chart."""
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Pick the indices of n_out points that keep the shape of a line.
+
+    Largest-Triangle-Three-Buckets: the first and last points are kept,
+    the rest are split into equal buckets and from each bucket the point
+    forming the largest triangle with the previously kept point and the
+    average of the next bucket is chosen.
+
+    Args:
+        x: Ascending x values
+        y: Y values
+        n_out: Number of points to keep
+
+    Returns:
+        np.ndarray: Ascending indices of the kept points
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def build_chart() -> go.Figure:
+    """Build the empty price chart with its two traces."""
     fig = go.Figure()
 
-    price_trace = go.Scatter(
-        x=symbol_data["collected_at"],
-        y=symbol_data["price"],
+    price_trace = go.Scattergl(
         mode="lines",
         name="Price",
         line=dict(color="#2ecc71", width=2),
     )
     fig.add_trace(price_trace)
 
-    ma_trace = go.Scatter(
-        x=symbol_data["collected_at"],
-        y=symbol_data["price_ma_5"],
+    ma_trace = go.Scattergl(
         mode="lines",
         name="5dk MA",
         line=dict(color="#3498db", width=1, dash="dash"),
@@ -146,16 +431,69 @@ def create_chart(symbol_data: pd.DataFrame, symbol: str, timestamp: str) -> None
     fig.add_trace(ma_trace)
 
     fig.update_layout(
-        title=f"{symbol} Price Chart",
         xaxis_title="Time",
         yaxis_title="Price ($)",
         template="plotly_dark",
         height=500,
         uirevision=True,
     )
+    return fig
+
+
+def create_chart(symbol_data: pd.DataFrame, symbol: str, timestamp: str) -> None:
+    """Create price chart.
+
+    The figure is built once per session and kept in session state;
+    each refresh only swaps in the new trace data.
+    """
+    if "chart" not in st.session_state:
+        st.session_state.chart = build_chart()
+    fig = st.session_state.chart
+
+    # The chart cannot show more points than it has pixels, so long
+    # ranges are downsampled before they are sent to the browser
+    times = symbol_data["collected_at"].astype("int64").to_numpy()
+    prices = symbol_data["price"].to_numpy(dtype=float)
+    indices = lttb_indices((times - times[0]) / 1e9, prices, MAX_CHART_POINTS)
+    if len(indices) < len(symbol_data):
+        symbol_data = symbol_data.iloc[indices]
+
+    price_trace, ma_trace = fig.data
+    with fig.batch_update():
+        price_trace.x = symbol_data["collected_at"]
+        price_trace.y = symbol_data["price"]
+        ma_trace.x = symbol_data["collected_at"]
+        ma_trace.y = symbol_data["price_ma_5"]
+        fig.layout.title.text = f"{symbol} Price Chart"
+
     st.plotly_chart(fig, use_container_width=True, key=f"chart_{symbol}")
 
 
+@st.fragment(run_every=REFRESH_INTERVAL)
+def render_live(engine: Engine, hours: int, symbol: str) -> None:
+    """Show metrics, chart and table; reruns on its own every refresh."""
+    try:
+        time_format = "%H:%M:%S.%f"
+        current_time = datetime.now().strftime(time_format)[:-4]
+        st.caption(f"Last update: {current_time}")
+
+        symbol_data = update_series(engine, symbol, hours)
+        if symbol_data.empty:
+            st.warning("Data not found!")
+            return
+
+        # Metrics and table come from their own small queries, so their
+        # cost does not grow with the chart's time range
+        create_metrics(load_symbol_stats(engine, symbol, hours), symbol)
+        create_chart(symbol_data, symbol, current_time)
+
+        recent_data = load_recent_table(engine, symbol)
+        st.dataframe(recent_data, height=400, column_config=TABLE_COLUMNS)
+
+    except Exception as e:
+        st.error(f"An error occurred: {str(e)}")
+
+
 def main() -> None:
     """Main application function."""
     engine = get_db_connection()
@@ -174,105 +512,20 @@ def main() -> None:
             "key": "hours_slider"
         }
         hours = st.slider(**slider_params)
-        update_time = st.empty()
-
-    # Use session state to store a counter for unique keys
-    if 'counter' not in st.session_state:
-        st.session_state.counter = 0
-    
-    # Increment counter on each iteration
-    def get_unique_key():
-        st.session_state.counter += 1
-        return str(st.session_state.counter)
-
-    metrics_placeholder = st.empty()
-    chart_placeholder = st.empty()
-    table_placeholder = st.empty()
-
-    df = load_data(engine, hours)
-    if df.empty:
+
+    symbols = load_symbols(engine)
+    if not symbols:
         st.warning("Data not found!")
         return
 
-    symbols = sorted(df["symbol"].unique())
-    symbol_container = st.sidebar.empty()
-    selected_symbol = symbol_container.selectbox("Stock", symbols, key="symbol_select")
+    selected_symbol = st.sidebar.selectbox("Stock", symbols, key="symbol_select")
 
-    while True:
-        try:
-            time_format = "%H:%M:%S.%f"
-            current_time = datetime.now().strftime(time_format)[:-4]
-            update_msg = f"Last update: {current_time}"
-            update_time.text(update_msg)
-
-            # Get a unique key for this iteration
-            unique_key = get_unique_key()
-
-            st.cache_data.clear()
-            df = load_data(engine, hours)
-
-            if df.empty:
-                st.warning("Data not found!")
-                time.sleep(REFRESH_INTERVAL)
-                continue
-
-            symbol_data = df[df["symbol"] == selected_symbol].copy()
-            if not symbol_data.empty:
-                symbol_data['display_time'] = (
-                    symbol_data['collected_at'].dt.strftime('%H:%M:%S.%f').str[:-4]
-                )
+    if os.getenv("APPLY_SCHEMA_HINTS"):
+        apply_schema_hints(engine, symbols[0])
 
-                with metrics_placeholder.container():
-                    create_metrics(symbol_data, selected_symbol)
-
-                with chart_placeholder.container():
-                    # Use the unique key for this chart
-                    fig = go.Figure()
-
-                    price_trace = go.Scatter(
-                        x=symbol_data["collected_at"],
-                        y=symbol_data["price"],
-                        mode="lines",
-                        name="Price",
-                        line=dict(color="#2ecc71", width=2),
-                    )
-                    fig.add_trace(price_trace)
-
-                    ma_trace = go.Scatter(
-                        x=symbol_data["collected_at"],
-                        y=symbol_data["price_ma_5"],
-                        mode="lines",
-                        name="5dk MA",
-                        line=dict(color="#3498db", width=1, dash="dash"),
-                    )
-                    fig.add_trace(ma_trace)
-
-                    fig.update_layout(
-                        title=f"{selected_symbol} Price Chart",
-                        xaxis_title="Time",
-                        yaxis_title="Price ($)",
-                        template="plotly_dark",
-                        height=500,
-                        uirevision=True,
-                    )
-                    st.plotly_chart(fig, use_container_width=True, key=f"chart_{unique_key}")
-
-                with table_placeholder.container():
-                    display_df = symbol_data[["display_time", "price", "volume"]].copy()
-                    display_df.columns = ["Time", "Price", "Volume"]
-                    display_df["Price"] = display_df["Price"].map("${:,.2f}".format)
-                    display_df["Volume"] = display_df["Volume"].map("{:,.0f}".format)
-                    st.dataframe(
-                        display_df.head(10),
-                        height=400,
-                        key=f"table_{unique_key}"
-                    )
-
-            time.sleep(REFRESH_INTERVAL / 2)
-
-        except Exception as e:
-            st.error(f"An error occurred: {str(e)}")
-            time.sleep(REFRESH_INTERVAL)
+    # Only the fragment reruns on the refresh interval; the sidebar widgets
+    # trigger a full rerun when the user changes them
+    render_live(engine, hours, selected_symbol)
 
 
 if __name__ == "__main__":
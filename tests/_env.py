@@ -0,0 +1,36 @@
+"""Environment shared by the test fixtures, resolved once per run.
+
+The .env file is read here, once, the same way PostgresManager reads
+it; exported variables take precedence and missing ones fall back to
+the PostgresManager defaults.
+"""
+
+import functools
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import URL
+
+load_dotenv()
+
+
+@functools.lru_cache(maxsize=None)
+def db_url(database: Optional[str] = None) -> str:
+    """
+    Build the test database URL from the POSTGRES_* variables.
+
+    Args:
+        database: Database to connect to instead of POSTGRES_DB
+
+    Returns:
+        str: Database connection URL
+    """
+    return URL.create(
+        drivername="postgresql",
+        username=os.getenv("POSTGRES_USER", "postgres"),
+        password=os.getenv("POSTGRES_PASSWORD", "postgres"),
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=int(os.getenv("POSTGRES_PORT", "5432")),
+        database=database or os.getenv("POSTGRES_DB", "postgres"),
+    ).render_as_string(hide_password=False)
@@ -1,147 +1,254 @@
 """Module for configuration of test fixtures"""
 
+import hashlib
 import os
 from datetime import datetime
-from typing import Dict, Generator, List
+from types import MappingProxyType
+from typing import Any, Generator, Mapping, Optional, Tuple
 
 import pytest
-from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
-from sqlalchemy.engine.base import Engine
-from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.engine.base import Connection, Engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateIndex, CreateTable
 
-from src.database.postgres_manager import Base, PostgresManager, StockData
+from src.database.postgres_manager import AGGREGATE_VIEW, Base, PostgresManager
+from tests import _env
 
-load_dotenv()
+# Sample data timestamp, fixed so session-scoped fixtures stay reproducible
+FIXED_NOW = datetime(2024, 2, 20, 12, 0, 0)
 
 
 @pytest.fixture(scope="session")
-def db_url() -> str:
+def test_database() -> Generator[Optional[str], None, None]:
     """
-    Create test database URL.
+    Create a database of its own for this test run when one is needed.
 
-    Returns:
-        str: Database connection URL
+    With TEST_DB_TEMPLATE naming a database that already holds the
+    schema, the database is cloned from it with CREATE DATABASE ...
+    TEMPLATE, which copies files instead of replaying the DDL. Under
+    pytest-xdist every worker gets its own database, suffixed with
+    PYTEST_XDIST_WORKER, so parallel workers never share rows or locks.
+    The database (TEST_DB_NAME) becomes the database of the engine and
+    the manager and is dropped afterwards.
+
+    Yields:
+        Optional[str]: Name of the created database, None if not needed
     """
-    return (
-        f"postgresql://{os.getenv('POSTGRES_USER')}:"
-        f"{os.getenv('POSTGRES_PASSWORD')}@"
-        f"{os.getenv('POSTGRES_HOST')}:"
-        f"{os.getenv('POSTGRES_PORT')}/"
-        f"{os.getenv('POSTGRES_DB')}"
-    )
+    template = os.getenv("TEST_DB_TEMPLATE")
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if not template and not worker:
+        yield None
+        return
+
+    name = os.getenv("TEST_DB_NAME", "test_finnhub_db")
+    if worker:
+        name = f"{name}_{worker}"
+    create = f'CREATE DATABASE "{name}"'
+    if template:
+        create += f' TEMPLATE "{template}"'
+
+    maintenance = create_engine(_env.db_url("postgres"), isolation_level="AUTOCOMMIT")
+    with maintenance.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        conn.execute(text(create))
+    # Restored after the run, so nothing points at the dropped database
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("POSTGRES_DB", name)
+        yield name
+
+    with maintenance.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    maintenance.dispose()
 
 
 @pytest.fixture(scope="session")
-def engine():
-    DB_HOST = os.getenv("DB_HOST", "localhost")
-    DB_PORT = int(os.getenv("DB_PORT", "5432"))
-    DB_NAME = os.getenv("DB_NAME", "postgres")
-    DB_USER = os.getenv("DB_USER", "postgres")
-    DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
-
-    DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    
-    engine = create_engine(DATABASE_URL)
-    
-    # Create tables before running tests
-    Base.metadata.create_all(engine)
-    
-    return engine
+def engine(test_database: Optional[str]) -> Generator[Engine, None, None]:
+    """
+    Create the engine of the test database.
+
+    Args:
+        test_database: Test database fixture
+
+    Yields:
+        Engine: SQLAlchemy engine object
+    """
+    # Keep connections open across tests instead of reconnecting
+    engine = create_engine(
+        _env.db_url(test_database),
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+        pool_pre_ping=True,
+        pool_recycle=3600,
+    )
+
+    yield engine
+
+    engine.dispose()
+
+
+def schema_hash(engine: Engine) -> str:
+    """
+    Hash the DDL of the model tables and their indexes.
+
+    Args:
+        engine: SQLAlchemy engine object
+
+    Returns:
+        str: Hex digest that changes with any column, type or index change
+    """
+    ddl = []
+    for table in Base.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=engine.dialect)))
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            ddl.append(str(CreateIndex(index).compile(dialect=engine.dialect)))
+    return hashlib.sha1("\n".join(ddl).encode()).hexdigest()
 
 
 @pytest.fixture(scope="session")
-def tables(engine: Engine) -> Generator[None, None, None]:
+def tables(
+    engine: Engine, test_database: Optional[str]
+) -> Generator[None, None, None]:
     """
-    Create test tables and clean them up after tests.
+    Create test tables unless the database already has this schema.
+
+    The hash of the model DDL is kept as the comment of the stock_data
+    table, so later sessions skip the DDL while the database still holds
+    the same schema. A missing table or a different hash rebuilds it.
+    Tables are only dropped in CI. A database created for the run gets
+    the schema from its template or from create_all and is dropped whole.
 
     Args:
         engine: SQLAlchemy engine object
+        test_database: Test database fixture
 
     Yields:
         None: No value returned
     """
-    Base.metadata.create_all(engine)
+    if test_database is not None:
+        if not os.getenv("TEST_DB_TEMPLATE"):
+            Base.metadata.create_all(engine)
+        yield
+        return
+
+    current = schema_hash(engine)
+    with engine.connect() as conn:
+        stamped = conn.execute(
+            text("SELECT obj_description(to_regclass('stock_data'), 'pg_class')")
+        ).scalar()
+
+    if stamped != current:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {AGGREGATE_VIEW}"))
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text(f"COMMENT ON TABLE stock_data IS '{current}'"))
+
     yield
-    Base.metadata.drop_all(engine)
+
+    if os.getenv("CI") == "true":
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP MATERIALIZED VIEW IF EXISTS {AGGREGATE_VIEW}"))
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def db_connection(engine: Engine, tables: None) -> Generator[Connection, None, None]:
+    """
+    Open a connection whose transaction is rolled back after the test.
+
+    Args:
+        engine: SQLAlchemy engine object
+        tables: Tables fixture
+
+    Yields:
+        Connection: Connection inside the outer test transaction
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+
+    yield connection
+
+    transaction.rollback()
+    connection.close()
 
 
 @pytest.fixture(scope="session")
-def db_session(engine):
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    
-    yield session
-    
-    # Clean up after tests
-    session.close()
-
-
-@pytest.fixture(scope="session", autouse=True)
-def load_env() -> None:
-    """Load environment variables before running tests."""
-    load_dotenv()
-    # Test ortamı için varsayılan değerleri ayarla
-    os.environ.setdefault("POSTGRES_HOST", "localhost")
-    os.environ.setdefault("POSTGRES_PORT", "5432")
-    os.environ.setdefault("POSTGRES_DB", "postgres")
-    os.environ.setdefault("POSTGRES_USER", "postgres")
-    os.environ.setdefault("POSTGRES_PASSWORD", "postgres")
+def postgres_manager(
+    test_database: Optional[str],
+) -> Generator[PostgresManager, None, None]:
+    """Create the database manager once for the whole test session."""
+    manager = PostgresManager()
+    yield manager
+    manager.engine.dispose()
 
 
 @pytest.fixture
-def db_manager() -> Generator[PostgresManager, None, None]:
-    """Create a database manager for testing."""
-    manager = PostgresManager()
+def db_manager(
+    postgres_manager: PostgresManager, db_connection: Connection
+) -> Generator[PostgresManager, None, None]:
+    """Bind the shared database manager to the test transaction."""
+    manager = postgres_manager
+    # Tests read values back right after committing them, so skip the
+    # reload after commit and the implicit flush before every query
+    manager.Session = sessionmaker(
+        bind=db_connection,
+        join_transaction_mode="create_savepoint",
+        expire_on_commit=False,
+        autoflush=False,
+    )
+    manager._scoped = scoped_session(manager.Session)
+    # Symbol ids cached by an earlier test were rolled back with it
+    manager._symbol_ids.clear()
+    manager._symbol_names.clear()
+    manager._insert_count = 0
     yield manager
+    manager._scoped.remove()
 
 
 @pytest.fixture(scope="session")
-def sample_stock_data() -> Dict:
+def sample_stock_data() -> Mapping[str, Any]:
     """
     Create sample stock data for testing.
 
+    Read-only, since every test of the session shares it.
+
     Returns:
-        Dict: Sample data for testing
+        Mapping[str, Any]: Sample data for testing
     """
-    now = datetime.now()
-    return {
-        "symbol": "AAPL",
-        "price": 150.0,
-        "volume": 1000000.0,
-        "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
-        "collected_at": now.isoformat(),
-    }
+    return MappingProxyType(
+        {
+            "symbol": "AAPL",
+            "price": 150.0,
+            "volume": 1000000.0,
+            "timestamp": FIXED_NOW.strftime("%Y-%m-%d %H:%M:%S"),
+            "collected_at": FIXED_NOW.isoformat(),
+        }
+    )
 
 
 @pytest.fixture(scope="session")
-def multiple_stock_data() -> List[Dict]:
+def multiple_stock_data() -> Tuple[Mapping[str, Any], ...]:
     """
     Create multiple sample stock data for testing.
 
+    Read-only, since every test of the session shares it.
+
     Returns:
-        List[Dict]: Sample data list for testing
+        Tuple[Mapping[str, Any], ...]: Sample data for testing
     """
-    now = datetime.now()
-    return [
-        {
-            "symbol": symbol,
-            "price": 150.0,
-            "volume": 1000000.0,
-            "timestamp": now.strftime("%Y-%m-%d %H:%M:%S"),
-            "collected_at": now.isoformat(),
-        }
+    return tuple(
+        MappingProxyType(
+            {
+                "symbol": symbol,
+                "price": 150.0,
+                "volume": 1000000.0,
+                "timestamp": FIXED_NOW.strftime("%Y-%m-%d %H:%M:%S"),
+                "collected_at": FIXED_NOW.isoformat(),
+            }
+        )
         for symbol in ["AAPL", "MSFT", "GOOGL"]
-    ]
-
-
-@pytest.fixture(autouse=True)
-def clean_db(db_session):
-    try:
-        # Clean existing data
-        db_session.execute(text("TRUNCATE TABLE stock_data RESTART IDENTITY CASCADE"))
-        db_session.commit()
-    except Exception as e:
-        db_session.rollback()
-        raise e
+    )
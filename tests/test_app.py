@@ -0,0 +1,262 @@
+"""Test module for the dashboard helpers."""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.engine.base import Engine
+
+from src.visualization import app
+
+# update_series only hands the engine on to the patched loaders
+ENGINE = cast(Engine, None)
+
+# Column types of the pyarrow-backed frames load_data returns
+ARROW_DTYPES = {
+    "id": "int64[pyarrow]",
+    "collected_at": "timestamp[ns, tz=UTC][pyarrow]",
+    "price": "double[pyarrow]",
+}
+
+
+class FakeChartTable:
+    """Chart rows served to update_series in place of the database."""
+
+    def __init__(self) -> None:
+        self.rows: List[Tuple[int, datetime, float]] = []
+        # Rows collected up to here are in the 1 minute aggregate view
+        self.refreshed_at: Optional[datetime] = None
+
+    def add(self, row_id: int, collected_at: datetime, price: float) -> None:
+        self.rows.append((row_id, collected_at, price))
+
+    def frame(self) -> pd.DataFrame:
+        df = pd.DataFrame(self.rows, columns=list(ARROW_DTYPES))
+        return df.astype(ARROW_DTYPES)
+
+    def load_data(self, _engine: Any, symbol: str, since: datetime) -> pd.DataFrame:
+        df = self.frame()
+        df = df[df["collected_at"] > since]
+        return df.sort_values(["collected_at", "id"], ignore_index=True)
+
+    def load_buckets(self, _engine: Any, symbol: str, since: datetime) -> pd.DataFrame:
+        df = self.frame()
+        df = df[df["collected_at"] <= self.refreshed_at]
+        buckets = (
+            df.assign(collected_at=df["collected_at"].dt.floor("min"))
+            .groupby("collected_at", as_index=False)["price"]
+            .mean()
+        )
+        return buckets[buckets["collected_at"] > since].reset_index(drop=True)
+
+
+@pytest.fixture
+def chart_table(monkeypatch: pytest.MonkeyPatch) -> FakeChartTable:
+    """
+    Serve update_series from a fake table and a fresh session state.
+
+    Args:
+        monkeypatch: Pytest monkeypatch fixture
+
+    Returns:
+        FakeChartTable: Table the chart rows are read from
+    """
+    table = FakeChartTable()
+    monkeypatch.setattr(app.st, "session_state", {})
+    monkeypatch.setattr(app, "load_data", table.load_data)
+    monkeypatch.setattr(app, "load_buckets", table.load_buckets)
+    return table
+
+
+def rolling_average(frame: pd.DataFrame) -> List[float]:
+    """Recompute the 5 minute moving average of a frame from scratch."""
+    index = pd.DatetimeIndex(frame["collected_at"].astype("datetime64[ns, UTC]"))
+    prices = pd.Series(frame["price"].astype(float).to_numpy(), index=index)
+    return list(prices.rolling(app.MA_WINDOW).mean())
+
+
+@pytest.fixture
+def metrics(monkeypatch: pytest.MonkeyPatch) -> List[Tuple[Any, ...]]:
+    """
+    Record st.metric calls instead of rendering them.
+
+    Args:
+        monkeypatch: Pytest monkeypatch fixture
+
+    Returns:
+        List[Tuple[Any, ...]]: Arguments of every st.metric call
+    """
+    calls: List[Tuple[Any, ...]] = []
+    monkeypatch.setattr(app.st, "metric", lambda *args: calls.append(args))
+    return calls
+
+
+def test_create_metrics(metrics: List[Tuple[Any, ...]]) -> None:
+    """
+    Test for the metric texts of a window with data.
+
+    Args:
+        metrics: Recorded st.metric calls
+    """
+    stats: Dict[str, Optional[float]] = {
+        "last_price": 151.0,
+        "first_price": 150.0,
+        "avg_price": 150.5,
+        "last_volume": 1234567.0,
+    }
+
+    app.create_metrics(stats, "AAPL")
+
+    assert metrics == [
+        ("Son Fiyat", "$151.00", "1.00"),
+        ("Ortalama Fiyat", "$150.50"),
+        ("İşlem Hacmi", "1,234,567"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "stats",
+    [
+        {},
+        {
+            "last_price": None,
+            "first_price": None,
+            "avg_price": None,
+            "last_volume": None,
+        },
+    ],
+    ids=["load_error", "empty_window"],
+)
+def test_create_metrics_without_data(
+    metrics: List[Tuple[Any, ...]], stats: Dict[str, Any]
+) -> None:
+    """
+    Test that missing statistics are shown as n/a.
+
+    Args:
+        metrics: Recorded st.metric calls
+        stats: Statistics without values
+    """
+    app.create_metrics(stats, "AAPL")
+
+    assert metrics == [
+        ("Son Fiyat", "n/a"),
+        ("Ortalama Fiyat", "n/a"),
+        ("İşlem Hacmi", "n/a"),
+    ]
+
+
+def test_lttb_indices() -> None:
+    """Test that downsampling keeps the endpoints and the order of points."""
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500.0)
+    y[4321] = 10.0  # A spike the downsampled line has to keep
+
+    indices = app.lttb_indices(x, y, 100)
+
+    assert len(indices) == 100, "Wrong number of points kept"
+    assert indices[0] == 0 and indices[-1] == len(x) - 1, "Endpoints dropped"
+    assert np.all(np.diff(indices) > 0), "Indices should be strictly ascending"
+    assert 4321 in indices, "Spike dropped"
+
+
+@pytest.mark.parametrize("n_out", [500, 1000, 2])
+def test_lttb_indices_keeps_all(n_out: int) -> None:
+    """
+    Test that short series and too small targets are left as they are.
+
+    Args:
+        n_out: Number of points to keep
+    """
+    x = np.arange(500, dtype=float)
+
+    indices = app.lttb_indices(x, x, n_out)
+
+    assert indices.tolist() == list(range(500))
+
+
+def test_update_series_moving_average(chart_table: FakeChartTable) -> None:
+    """
+    Test that the incremental moving average matches a full recompute.
+
+    Args:
+        chart_table: Fake chart table fixture
+    """
+    start = datetime.now(timezone.utc) - timedelta(minutes=30)
+    row_id = 0
+    # Three refreshes, each adding ten minutes of rows 7 seconds apart
+    for _ in range(3):
+        for _ in range(86):
+            chart_table.add(row_id, start + timedelta(seconds=7 * row_id), row_id % 13)
+            row_id += 1
+        frame = app.update_series(ENGINE, "AAPL", 1)
+
+    assert frame["id"].tolist() == list(range(row_id)), "Rows missing or duplicated"
+    assert frame["price_ma_5"].tolist() == pytest.approx(rolling_average(frame))
+
+
+def test_update_series_late_rows(chart_table: FakeChartTable) -> None:
+    """
+    Test that rows committed after newer ones are still picked up.
+
+    Args:
+        chart_table: Fake chart table fixture
+    """
+    start = datetime.now(timezone.utc) - timedelta(minutes=10)
+    for i in range(10):
+        chart_table.add(i, start + timedelta(seconds=10 * i), 100.0 + i)
+    app.update_series(ENGINE, "AAPL", 1)
+
+    # Committed late: one older than the newest row seen, one with a new id
+    # but the same timestamp as the newest row
+    chart_table.add(10, start + timedelta(seconds=75), 50.0)
+    chart_table.add(11, start + timedelta(seconds=90), 60.0)
+    chart_table.add(12, start + timedelta(seconds=100), 110.0)
+    frame = app.update_series(ENGINE, "AAPL", 1)
+
+    assert sorted(frame["id"]) == list(range(13)), "Rows missing or duplicated"
+    assert frame["collected_at"].is_monotonic_increasing, "Rows out of order"
+    # Equal timestamps get the same window in the from-scratch average,
+    # so only compare rows with distinct timestamps
+    distinct = ~frame["collected_at"].duplicated(keep=False)
+    expected = pd.Series(rolling_average(frame), index=frame.index)[distinct]
+    assert frame["price_ma_5"][distinct].tolist() == pytest.approx(expected.tolist())
+
+
+def test_update_series_bucket_history(chart_table: FakeChartTable) -> None:
+    """
+    Test that long ranges start from 1 minute averages and go on raw.
+
+    Args:
+        chart_table: Fake chart table fixture
+    """
+    start = datetime.now(timezone.utc) - timedelta(minutes=100)
+    for i in range(720):
+        chart_table.add(i, start + timedelta(seconds=7 * i), i % 13)
+    # The view was last refreshed part way into a minute
+    chart_table.refreshed_at = start + timedelta(seconds=7 * 600)
+    frame = app.update_series(ENGINE, "AAPL", app.BUCKET_MIN_HOURS)
+
+    rows = chart_table.frame()
+    until = chart_table.refreshed_at.replace(second=0, microsecond=0)
+    history = rows[rows["collected_at"] < until]
+    buckets = history.groupby(history["collected_at"].dt.floor("min"))["price"]
+    is_bucket = frame["id"].isna()
+    assert frame["collected_at"].is_monotonic_increasing, "Rows out of order"
+    assert frame["price"][is_bucket].tolist() == pytest.approx(
+        buckets.mean().tolist()
+    ), "History should be the 1 minute averages before the newest minute"
+    raw_ids = rows["id"][rows["collected_at"] >= until].tolist()
+    assert frame["id"][~is_bucket].tolist() == raw_ids, "Raw rows missing"
+    assert frame["price_ma_5"].tolist() == pytest.approx(rolling_average(frame))
+
+    for i in range(720, 800):
+        chart_table.add(i, start + timedelta(seconds=7 * i), i % 13)
+    frame = app.update_series(ENGINE, "AAPL", app.BUCKET_MIN_HOURS)
+
+    assert frame["id"][~frame["id"].isna()].tolist() == raw_ids + list(
+        range(720, 800)
+    ), "Rows missing or duplicated"
+    assert frame["price_ma_5"].tolist() == pytest.approx(rolling_average(frame))
@@ -1,15 +1,27 @@
 """Test module for database operations"""
 
-from datetime import datetime
-from typing import Any, Dict, List, Union, cast
+import threading
+from datetime import datetime, timezone
+from typing import Any, Mapping, Tuple, Union, cast
 
 import pytest
-from sqlalchemy import text
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import select, text
+from sqlalchemy.engine.base import Connection, Engine
+from sqlalchemy.orm import sessionmaker
 
-from src.database.postgres_manager import PostgresManager, StockData, StockDataDict
+from src.database.postgres_manager import (
+    AGGREGATE_VIEW_DDL,
+    NOTIFY_CHANNEL,
+    PostgresManager,
+    StockData,
+    Symbol,
+)
 
-InvalidDataDict = Dict[str, Union[str, float, None]]
+StockDataRows = Tuple[Mapping[str, Any], ...]
+
+PREFIX_DATE = "2024-02-20 12:"
+PREFIX_ISO = "2024-02-20T12:"
+SUFFIXES = tuple(f"{i:02d}:00" for i in range(5))
 
 
 def test_db_connection(db_manager: PostgresManager) -> None:
@@ -17,47 +29,82 @@ def test_db_connection(db_manager: PostgresManager) -> None:
     assert db_manager is not None
 
 
-def test_insert_stock_data(db_manager: PostgresManager) -> None:
-    """Test inserting stock data."""
+@pytest.mark.parametrize(
+    "timestamp",
+    [datetime(2024, 2, 20, 12, 0, 0), "2024-02-20 12:00:00"],
+    ids=["datetime", "string"],
+)
+def test_insert_stock_data(
+    db_manager: PostgresManager, timestamp: Union[datetime, str]
+) -> None:
+    """Test inserting stock data with datetime and string timestamps."""
     test_data = {
         "symbol": "TEST",
         "price": 100.0,
         "volume": 1000.0,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "collected_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "timestamp": timestamp,
+        "collected_at": timestamp,
     }
     result = db_manager.insert_stock_data(test_data)
     assert result is True
 
 
-def test_get_latest_records(db_manager: PostgresManager) -> None:
+def test_naive_timestamps_are_utc(
+    db_manager: PostgresManager,
+    db_connection: Connection,
+    sample_stock_data: Mapping[str, Any],
+) -> None:
+    """
+    Test that naive timestamps are stored as UTC.
+
+    Args:
+        db_manager: PostgresManager fixture
+        db_connection: Connection fixture
+        sample_stock_data: Sample data fixture
+    """
+    # A session time zone other than UTC must not shift the values;
+    # SET is undone with the test transaction
+    db_connection.execute(text("SET TIME ZONE 'Asia/Tokyo'"))
+
+    naive = datetime(2024, 2, 20, 12, 0, 0)
+    ids = db_manager.bulk_insert_stock_data(
+        [{**sample_stock_data, "timestamp": naive, "collected_at": naive}]
+    )
+
+    with db_manager.Session() as session:
+        record = session.execute(
+            select(StockData.timestamp, StockData.collected_at).where(
+                StockData.id == ids[0]
+            )
+        ).one()
+    expected = naive.replace(tzinfo=timezone.utc)
+    assert record.timestamp == expected, "Timestamp should be read as UTC"
+    assert record.collected_at == expected, "Collected_at should be read as UTC"
+
+
+def test_get_latest_records(
+    db_manager: PostgresManager, sample_stock_data: Mapping[str, Any]
+) -> None:
     """
     Test for getting latest records.
 
     Args:
         db_manager: PostgresManager fixture
+        sample_stock_data: Sample data fixture
     """
     # Insert some test data first
     test_data = [
         {
-            "symbol": "TEST1",
-            "price": 100.0,
-            "volume": 1000.0,
-            "timestamp": datetime.now(),
-            "collected_at": datetime.now()
-        },
-        {
-            "symbol": "TEST2",
-            "price": 200.0,
-            "volume": 2000.0,
-            "timestamp": datetime.now(),
-            "collected_at": datetime.now()
+            **sample_stock_data,
+            "price": 100.0 + i,
+            "timestamp": PREFIX_DATE + suffix,
+            "collected_at": PREFIX_ISO + suffix,
         }
+        for i, suffix in enumerate(SUFFIXES)
     ]
-    
-    for data in test_data:
-        db_manager.insert_stock_data(data)
-    
+
+    db_manager.bulk_insert_stock_data(test_data)
+
     # Test getting latest records
     records = db_manager.get_latest_records(limit=3)
     assert len(records) > 0, "No records returned"
@@ -67,7 +114,7 @@ def test_get_latest_records(db_manager: PostgresManager) -> None:
 
 def test_bulk_insert(
     db_manager: PostgresManager,
-    multiple_stock_data: List[StockDataDict],
+    multiple_stock_data: StockDataRows,
 ) -> None:
     """
     Test for bulk data insertion.
@@ -76,17 +123,24 @@ def test_bulk_insert(
         db_manager: PostgresManager fixture
         multiple_stock_data: Multiple data fixture
     """
-    for data in multiple_stock_data:
-        result = db_manager.insert_stock_data(data)
-        assert result is not None, f"Data could not be inserted: {data}"
+    ids = db_manager.bulk_insert_stock_data(multiple_stock_data)
+    assert len(ids) == len(multiple_stock_data), "Data could not be inserted"
 
     session_factory = cast(sessionmaker, db_manager.Session)
     session = session_factory()
     try:
-        for data in multiple_stock_data:
-            record = session.query(StockData).filter_by(symbol=data["symbol"]).first()
+        # One query for all rows, matched to the inputs through the ids
+        records = session.execute(
+            select(StockData.id, Symbol.symbol, StockData.price)
+            .join(Symbol)
+            .where(StockData.id.in_(ids))
+        ).all()
+        by_id = {record.id: record for record in records}
 
+        for stock_data_id, data in zip(ids, multiple_stock_data):
+            record = by_id.get(stock_data_id)
             assert record is not None, f"Record not found: {data['symbol']}"
+            assert record.symbol == data["symbol"], f"Id {stock_data_id} mismatched"
             assert (
                 record.price == data["price"]
             ), f"Price does not match: {data['symbol']}"
@@ -94,6 +148,115 @@ def test_bulk_insert(
         session.close()
 
 
+def test_bulk_insert_stock_data(
+    db_manager: PostgresManager,
+    multiple_stock_data: StockDataRows,
+) -> None:
+    """
+    Test for inserting a batch with a single statement.
+
+    Args:
+        db_manager: PostgresManager fixture
+        multiple_stock_data: Multiple data fixture
+    """
+    invalid_data = {**multiple_stock_data[0], "price": "invalid"}
+
+    ids = db_manager.bulk_insert_stock_data([*multiple_stock_data, invalid_data])
+    assert len(ids) == len(multiple_stock_data), "Invalid row should be skipped"
+    assert ids == sorted(ids), "Ids should follow insertion order"
+
+
+@pytest.mark.parametrize(
+    "bad_field",
+    [{"symbol": "TOOLONGSYMBOL"}, {"volume": 1e20}],
+    ids=["symbol_too_long", "volume_out_of_range"],
+)
+def test_bulk_insert_keeps_valid_rows(
+    db_manager: PostgresManager,
+    multiple_stock_data: StockDataRows,
+    bad_field: Mapping[str, Any],
+) -> None:
+    """
+    Test that a row the database rejects does not cost the whole batch.
+
+    Args:
+        db_manager: PostgresManager fixture
+        multiple_stock_data: Multiple data fixture
+        bad_field: Field value the database rejects
+    """
+    bad_data = {**multiple_stock_data[0], **bad_field}
+
+    ids = db_manager.bulk_insert_stock_data([bad_data, *multiple_stock_data])
+    assert len(ids) == len(multiple_stock_data), "Valid rows should be stored"
+
+    with db_manager.Session() as session:
+        symbols = session.execute(
+            select(Symbol.symbol).join(StockData).where(StockData.id.in_(ids))
+        ).scalars()
+        assert sorted(symbols) == sorted(d["symbol"] for d in multiple_stock_data)
+
+
+def test_refresh_aggregates(
+    db_manager: PostgresManager,
+    db_connection: Connection,
+    multiple_stock_data: StockDataRows,
+) -> None:
+    """
+    Test for refreshing the 1 minute aggregate view.
+
+    Args:
+        db_manager: PostgresManager fixture
+        db_connection: Connection fixture
+        multiple_stock_data: Multiple data fixture
+    """
+    # Created inside the test transaction, so the view is rolled back too
+    db_connection.exec_driver_sql(AGGREGATE_VIEW_DDL)
+    db_manager.bulk_insert_stock_data(multiple_stock_data)
+
+    assert db_manager.refresh_aggregates() is True
+
+    with db_manager.Session() as session:
+        symbols = session.execute(
+            text("SELECT DISTINCT symbol_id FROM stock_data_1m")
+        ).all()
+    assert len(symbols) == len(multiple_stock_data), "One bucket per symbol expected"
+
+
+def test_subscribe(db_manager: PostgresManager, engine: Engine) -> None:
+    """
+    Test for turning notifications into symbol and price updates.
+
+    Args:
+        db_manager: PostgresManager fixture
+        engine: SQLAlchemy engine object
+    """
+    symbol_id = db_manager._get_symbol_id("TEST")
+    stop = threading.Event()
+
+    def notify() -> None:
+        # Keep notifying until the subscriber has started listening
+        with engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as conn:
+            while not stop.wait(0.05):
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": NOTIFY_CHANNEL, "payload": f"{symbol_id}:150.5"},
+                )
+
+    notifier = threading.Thread(target=notify, daemon=True)
+    notifier.start()
+    updates = db_manager.subscribe(timeout=0.1)
+    try:
+        update = next(updates)
+    finally:
+        updates.close()
+        stop.set()
+        notifier.join()
+
+    assert update == {"symbol": "TEST", "price": 150.5}
+
+
 def test_error_handling(db_manager: PostgresManager) -> None:
     """
     Test for error handling.
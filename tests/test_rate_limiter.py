@@ -1,17 +1,51 @@
 """Test module for rate limiter."""
 
+import threading
 import time
-from typing import List
 
 import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
 
+import src.utils.rate_limiter as rate_limiter_module
 from src.utils.rate_limiter import RateLimiter
 
 
+class FakeClock:
+    """Virtual clock whose sleep advances time instantly."""
+
+    def __init__(self) -> None:
+        self.now = time.monotonic()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+
 @pytest.fixture
-def rate_limiter() -> RateLimiter:
+def fake_clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """
+    Replace the time module seen by the rate limiter with a virtual clock.
+
+    Args:
+        monkeypatch: Pytest monkeypatch fixture
+
+    Returns:
+        FakeClock: Clock driving the rate limiter
+    """
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter_module, "time", clock)
+    return clock
+
+
+@pytest.fixture(scope="module")
+def shared_rate_limiter() -> RateLimiter:
     """
-    Create RateLimiter instance for testing.
+    Create one RateLimiter instance for the whole module.
 
     Returns:
         RateLimiter: Rate limiter class instance
@@ -19,69 +53,172 @@ def rate_limiter() -> RateLimiter:
     return RateLimiter(max_requests=2, time_window=1)
 
 
-def test_rate_limiter_basic(rate_limiter: RateLimiter) -> None:
+@pytest.fixture
+def rate_limiter(shared_rate_limiter: RateLimiter) -> RateLimiter:
+    """
+    Hand out the shared RateLimiter with a full bucket.
+
+    Args:
+        shared_rate_limiter: Module-scoped RateLimiter fixture
+
+    Returns:
+        RateLimiter: Rate limiter class instance
+    """
+    shared_rate_limiter.reset()
+    return shared_rate_limiter
+
+
+def test_rate_limiter_basic(fake_clock: FakeClock, rate_limiter: RateLimiter) -> None:
     """
     Basic rate limiting test.
 
     Args:
+        fake_clock: FakeClock fixture
         rate_limiter: RateLimiter fixture'ı
     """
 
-    start_time = time.time()
+    start_time = fake_clock.monotonic()
     rate_limiter.wait_if_needed()
     rate_limiter.wait_if_needed()
-    elapsed = time.time() - start_time
+    elapsed = fake_clock.monotonic() - start_time
 
-    assert elapsed < 1.0, f"First two requests took too long: {elapsed:.2f} seconds"
+    assert elapsed == 0.0, f"First two requests should not wait: {elapsed:.2f} seconds"
 
 
-def test_rate_limiter_throttling(rate_limiter: RateLimiter) -> None:
+def test_rate_limiter_throttling(
+    fake_clock: FakeClock, rate_limiter: RateLimiter
+) -> None:
     """
     Test for request throttling.
 
     Args:
+        fake_clock: FakeClock fixture
         rate_limiter: RateLimiter fixture'ı
     """
 
     for _ in range(rate_limiter.max_requests):
         rate_limiter.wait_if_needed()
 
-    start_time = time.time()
+    start_time = fake_clock.monotonic()
     rate_limiter.wait_if_needed()
-    elapsed = time.time() - start_time
+    elapsed = fake_clock.monotonic() - start_time
 
-    assert elapsed > 0.1, f"Third request waited too short: {elapsed:.2f} seconds"
+    # Exactly one token has to refill
+    assert elapsed == pytest.approx(
+        1 / rate_limiter.rate
+    ), f"Third request waited {elapsed:.2f} seconds"
 
 
-def test_rate_limiter_window_reset(rate_limiter):
+def test_rate_limiter_window_reset(
+    fake_clock: FakeClock, rate_limiter: RateLimiter
+) -> None:
+    """
+    Test for the bucket refilling once the window has passed.
+
+    Args:
+        fake_clock: FakeClock fixture
+        rate_limiter: RateLimiter fixture'ı
+    """
     # Fill up the window
     for _ in range(rate_limiter.max_requests):
         rate_limiter.wait_if_needed()
-    
-    start_time = time.time()
+
+    start_time = fake_clock.monotonic()
     # Make one more request that should be delayed
     rate_limiter.wait_if_needed()
-    elapsed = time.time() - start_time
-    
-    # Should have waited due to rate limiting
-    assert elapsed > 0.1, f"Request should be delayed when window is full: {elapsed:.2f} seconds"
+    elapsed = fake_clock.monotonic() - start_time
+
+    # Should have waited for one token due to rate limiting
+    assert elapsed == pytest.approx(
+        1 / rate_limiter.rate
+    ), f"Request should be delayed when window is full: {elapsed:.2f} seconds"
+
+    # After a full window the bucket is full again
+    fake_clock.advance(rate_limiter.time_window + 0.1)
+    start_time = fake_clock.monotonic()
+    for _ in range(rate_limiter.max_requests):
+        rate_limiter.wait_if_needed()
+    elapsed = fake_clock.monotonic() - start_time
 
+    assert (
+        elapsed == 0.0
+    ), f"Requests after the window should not wait: {elapsed:.2f} seconds"
 
-def test_rate_limiter_continuous_requests(rate_limiter: RateLimiter) -> None:
+
+def test_rate_limiter_continuous_requests(
+    fake_clock: FakeClock, rate_limiter: RateLimiter
+) -> None:
     """
     Test for continuous requests.
 
     Args:
+        fake_clock: FakeClock fixture
         rate_limiter: RateLimiter fixture'ı
     """
-    # Make multiple requests
-    for _ in range(5):
+    requests = rate_limiter.max_requests + 3
+    start_time = fake_clock.monotonic()
+    for _ in range(requests):
         rate_limiter.wait_if_needed()
-    
-    # Should not exceed rate limit
-    assert len(rate_limiter.requests) <= rate_limiter.max_requests
+    elapsed = fake_clock.monotonic() - start_time
+
+    # The full bucket covers the first requests, each later one waits
+    # for a token to refill and spends it right away
+    assert elapsed == pytest.approx(
+        (requests - rate_limiter.max_requests) / rate_limiter.rate
+    ), f"Requests beyond the bucket were not paced: {elapsed:.2f} seconds"
+    assert rate_limiter.tokens == pytest.approx(0.0), "Bucket should be empty"
+
+
+@pytest.mark.slow
+def test_rate_limiter_concurrent_requests() -> None:
+    """Test for requests from several threads."""
+    rate_limiter = RateLimiter(max_requests=50, time_window=1)
+
+    def worker() -> None:
+        for _ in range(10):
+            rate_limiter.wait_if_needed()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+
+    start_ns = time.monotonic_ns()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed_ns = time.monotonic_ns() - start_ns
+
+    # 80 requests: 50 from the full bucket, 30 more at 50 per second
+    assert elapsed_ns >= 550_000_000, (
+        f"Concurrent requests were not limited: {elapsed_ns / 1e9:.2f} seconds"
+    )
+    assert rate_limiter.tokens >= 0.0, "Tokens should never go negative"
+
+
+def test_wait_if_needed_fast_path(
+    benchmark: BenchmarkFixture, rate_limiter: RateLimiter
+) -> None:
+    """
+    Benchmark a call that finds a token in the bucket.
+
+    The bucket is refilled before every round, so no call ever sleeps.
+    pytest-benchmark skips it under pytest-xdist, so it only runs without
+    -n (see README).
+
+    Args:
+        benchmark: pytest-benchmark fixture
+        rate_limiter: RateLimiter fixture'ı
+    """
+    benchmark.pedantic(
+        rate_limiter.wait_if_needed,
+        setup=rate_limiter.reset,
+        rounds=1000,
+        warmup_rounds=100,
+    )
+
+    assert rate_limiter.tokens == rate_limiter.max_requests - 1
 
 
+@pytest.mark.fast
 def test_rate_limiter_edge_cases() -> None:
     """Test for edge cases."""
 
@@ -92,26 +229,30 @@ def test_rate_limiter_edge_cases() -> None:
         RateLimiter(max_requests=30, time_window=0)
 
 
-def test_rate_limiter_high_load(rate_limiter: RateLimiter) -> None:
+def test_rate_limiter_high_load(
+    fake_clock: FakeClock, rate_limiter: RateLimiter
+) -> None:
     """
     Test for high load.
 
     Args:
+        fake_clock: FakeClock fixture
         rate_limiter: RateLimiter fixture'ı
     """
-    start_time = time.time()
+    start_time = fake_clock.monotonic()
     request_count = 10
 
     # Make many requests in a row
     for _ in range(request_count):
         rate_limiter.wait_if_needed()
 
-    total_time = time.time() - start_time
-    expected_time = (request_count - 2) / 2  # First 2 requests pass immediately
+    total_time = fake_clock.monotonic() - start_time
+    # The full bucket covers the first requests, the rest wait for refills
+    expected_time = (request_count - rate_limiter.max_requests) / rate_limiter.rate
 
-    assert total_time >= expected_time, (
+    assert total_time == pytest.approx(expected_time), (
         f"Rate limiting not working under high load: "
-        f"{total_time:.2f} < {expected_time:.2f}"
+        f"{total_time:.2f} != {expected_time:.2f}"
     )
 
 